@@ -1,8 +1,14 @@
 from .args import *
+from .cache import *
 from .clean import *
+from .cmake import *
+from .compiler_cache import *
 from .conan import *
 from .inspect import *
+from .logs import *
 from .manifest import *
+from .testing import *
 from .version import *
+from .watch import *
 
 __all__ = [name for name in dir() if not name.startswith("__")]
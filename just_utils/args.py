@@ -1,4 +1,5 @@
 import argparse
+from pathlib import Path
 from termcolor import colored
 
 
@@ -28,6 +29,13 @@ def default_cmake_parser(additional_choosers=[]):
         help="reconfigure cmake only (no build)",
         default=False,
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of parallel build jobs and tests (defaults to a count chosen for the machine)",
+    )
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument(
         "-b",
@@ -92,4 +100,46 @@ def default_cmake_parser(additional_choosers=[]):
             help="Build tests",
             default=False,
         )
+        parser.add_argument(
+            "--shard-index",
+            type=int,
+            default=0,
+            help="Index of the test shard to run on this machine",
+        )
+        parser.add_argument(
+            "--shard-count",
+            type=int,
+            default=1,
+            help="Total number of test shards",
+        )
+        parser.add_argument(
+            "--rerun-failed",
+            action="store_true",
+            default=False,
+            help="Run only the tests that failed last time",
+        )
+        parser.add_argument(
+            "--junit",
+            type=Path,
+            default=None,
+            help="Write a JUnit XML report to this path",
+        )
+    if "compiler_cache" in additional_choosers:
+        parser.add_argument(
+            "-k",
+            "--compiler-cache",
+            action="store_true",
+            help="Use ccache/sccache for compilation",
+            default=False,
+        )
+        parser.add_argument(
+            "--compiler-cache-dir",
+            default=str(Path.home() / ".cache" / "just-utils" / "compiler-cache"),
+            help="Compiler cache directory",
+        )
+        parser.add_argument(
+            "--compiler-cache-size",
+            default="10G",
+            help="Compiler cache size limit",
+        )
     return parser
@@ -0,0 +1,168 @@
+import os
+import re
+import json
+import sqlite3
+from contextlib import closing
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from termcolor import cprint, colored
+
+
+SIZE_REGEX = r'^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*$'
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(size) -> int:
+    if isinstance(size, int):
+        return size
+    res = re.match(SIZE_REGEX, str(size), re.IGNORECASE)
+    if res is None:
+        raise ValueError(f"Invalid size: {size}")
+    return int(float(res.group(1)) * SIZE_UNITS[res.group(2).upper()])
+
+
+def format_size(size: int) -> str:
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    stack = [str(path)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    pass
+    return total
+
+
+def _split_ref(ref: str):
+    ref = ref.split("%")[0]
+    name, _, rrev = ref.partition("#")
+    return name, rrev or None
+
+
+class CachePackage:
+    def __init__(self, reference: str, rrev: str, pkgid: str, prev: str, path: Path, lru: int):
+        self.reference = reference
+        self.rrev = rrev
+        self.pkgid = pkgid
+        self.prev = prev
+        self.path = path
+        self.lru = lru
+        self.size = _dir_size(path)
+
+    @property
+    def pref(self):
+        return f"{self.reference}#{self.rrev}:{self.pkgid}#{self.prev}"
+
+    @property
+    def last_used(self):
+        return datetime.fromtimestamp(self.lru)
+
+
+class ConanCache:
+    def __init__(self, storage: Path | None = None):
+        if storage is None:
+            home = subprocess.check_output(["conan", "config", "home"], text=True, encoding="utf-8")
+            storage = Path(home.strip()) / "p"
+        self.storage = storage
+        self.db = storage / "cache.sqlite3"
+
+    def packages(self):
+        if not self.db.exists():
+            raise ValueError(f"File {self.db} does not exist")
+        # read-only: conan owns the database, evictions go through `conan remove`
+        with closing(sqlite3.connect(f"{self.db.as_uri()}?mode=ro", uri=True)) as db:
+            columns = {row[1] for row in db.execute("PRAGMA table_info(packages)")}
+            lru = "lru" if "lru" in columns else "timestamp"
+            rows = db.execute(
+                f"SELECT reference, rrev, pkgid, prev, path, {lru} FROM packages "
+                "WHERE pkgid IS NOT NULL AND prev IS NOT NULL"
+            ).fetchall()
+        res = [
+            CachePackage(reference, rrev, pkgid, prev, self.storage / path, int(last_used or 0))
+            for reference, rrev, pkgid, prev, path, last_used in rows
+        ]
+        return sorted(res, key=lambda p: p.lru)
+
+    def remove(self, package: CachePackage):
+        return subprocess.call(
+            ["conan", "remove", package.pref, "-c", "-vquiet"],
+            stdout=subprocess.DEVNULL,
+        )
+
+    def pretty_print(self, packages=None):
+        if packages is None:
+            packages = self.packages()
+        print("-- conan cache --")
+        for package in packages:
+            print(
+                f"{colored(package.reference, 'magenta', attrs=['bold']):<50} "
+                f"{colored(package.pkgid[:12], 'green')} "
+                f"{colored(format_size(package.size), 'yellow'):>20} "
+                f"{package.last_used:%Y-%m-%d %H:%M}"
+            )
+        total = sum(p.size for p in packages)
+        print(f"{len(packages)} packages, {colored(format_size(total), 'yellow', attrs=['bold'])}")
+        print()
+
+    def collect_garbage(self, budget, protected=set(), dry_run: bool = False, verbose: bool = True):
+        budget = parse_size(budget)
+        packages = self.packages()
+        if verbose:
+            self.pretty_print(packages)
+        total = sum(p.size for p in packages)
+        freed = 0
+        for package in packages:
+            if total - freed <= budget:
+                break
+            if package.reference in protected or f"{package.reference}#{package.rrev}" in protected:
+                continue
+            if verbose:
+                cprint(f"- evicting {package.pref} ({format_size(package.size)})", "yellow")
+            if dry_run or self.remove(package) == 0:
+                freed += package.size
+            else:
+                cprint(f"Failed to remove {package.pref}", "red")
+        if total - freed > budget:
+            cprint(f"cache is {format_size(total - freed)}, over budget of {format_size(budget)} (remaining packages are protected)", "red")
+        cprint(f"freed {format_size(freed)}{' (dry run)' if dry_run else ''}", "green", attrs=["bold"])
+        return freed
+
+
+def lockfile_refs(path: Path):
+    if not path.exists():
+        raise ValueError(f"File {path} does not exist")
+    data = json.loads(path.read_text())
+    res = set()
+    for section in ("requires", "build_requires", "python_requires", "config_requires"):
+        for ref in data.get(section, []):
+            name, rrev = _split_ref(ref)
+            res.add(f"{name}#{rrev}" if rrev else name)
+    return res
+
+
+def graph_refs(graph: dict):
+    res = set()
+    for node in graph["graph"]["nodes"].values():
+        ref = node.get("ref")
+        if not ref or ref == "conanfile":
+            continue
+        name, rrev = _split_ref(ref)
+        res.add(f"{name}#{rrev}" if rrev else name)
+    return res
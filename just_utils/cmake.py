@@ -0,0 +1,180 @@
+import os
+import json
+import shutil
+import hashlib
+from pathlib import Path
+from termcolor import cprint, colored
+from .conan import cmake_build_type
+from .logs import BuildLog
+from .process import run_with_progress
+from .compiler_cache import CompilerCache, compiler_cache_from_args
+
+
+CONFIGURE_STAMP_FILE = "just-utils-configure.json"
+MAKEFILE_GENERATORS = ["Unix Makefiles", "MinGW Makefiles", "MSYS Makefiles", "NMake Makefiles"]
+# rough peak memory of a single C++ compiler process
+MEMORY_PER_JOB = 2 * 1024 ** 3
+
+
+def build_jobs() -> int:
+    cpus = os.cpu_count() or 1
+    try:
+        memory = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return cpus
+    return max(1, min(cpus, memory // MEMORY_PER_JOB))
+
+
+def _expand(value: str, root: Path, *bases: Path) -> Path:
+    path = Path(value.replace("${sourceDir}", str(root)))
+    if path.is_absolute():
+        return path
+    # same lookup as cmake: relative paths try each base in order, e.g. binaryDir then sourceDir
+    for base in bases:
+        if (base / path).exists():
+            return base / path
+    return bases[-1] / path
+
+
+def _file_hash(path: Path | None):
+    if path is None or not path.exists():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class CMake:
+    def __init__(
+        self,
+        build_type: str,
+        verbose: bool,
+        root: Path = Path.cwd(),
+        logs: bool = True,
+        compiler_cache: CompilerCache | None = None,
+        jobs: int | None = None,
+    ):
+        self.root = root
+        self.build_type = build_type
+        self.verbose = verbose
+        self.logs = logs
+        self.compiler_cache = compiler_cache
+        self.jobs = jobs or build_jobs()
+        self.last_log = None
+
+    def presets_path(self) -> Path:
+        # cmake_layout: multi-config generators share build/, single-config ones use build/<BuildType>
+        for path in [
+            self.root / "build" / "generators" / "CMakePresets.json",
+            self.root / "build" / cmake_build_type(self.build_type) / "generators" / "CMakePresets.json",
+        ]:
+            if path.exists():
+                return path
+        raise ValueError(f"No Conan-generated CMakePresets.json found in {self.root / 'build'}, run conan install first")
+
+    def presets(self):
+        path = self.presets_path()
+        data = json.loads(path.read_text())
+        build_name = f"conan-{self.build_type}"
+        build = next((p for p in data.get("buildPresets", []) if p["name"] == build_name), None)
+        if build is None:
+            raise ValueError(f"Build preset {build_name} not found in {path}")
+        configure = next((p for p in data.get("configurePresets", []) if p["name"] == build["configurePreset"]), None)
+        if configure is None:
+            raise ValueError(f"Configure preset {build['configurePreset']} not found in {path}")
+        return configure, build
+
+    def _generator(self, configure: dict):
+        generator = configure.get("generator")
+        if generator is not None and generator not in MAKEFILE_GENERATORS:
+            return generator
+        if shutil.which("ninja") is None:
+            return generator
+        binary_dir = _expand(configure["binaryDir"], self.root, self.root)
+        if (binary_dir / "CMakeCache.txt").exists() and not (binary_dir / "build.ninja").exists():
+            # switching generators needs a clean build directory
+            return generator
+        return "Ninja"
+
+    def _fingerprint(self, configure: dict, generator: str | None, fwd_args):
+        toolchain = configure.get("toolchainFile")
+        if toolchain:
+            binary_dir = _expand(configure["binaryDir"], self.root, self.root)
+            toolchain = _expand(toolchain, self.root, binary_dir, self.root)
+        return {
+            "preset": configure,
+            "generator": generator,
+            "toolchain": _file_hash(toolchain) if toolchain else None,
+            "args": list(fwd_args),
+            "compiler_cache": self.compiler_cache.launcher_variables() if self.compiler_cache is not None else None,
+        }
+
+    def _env(self):
+        env = os.environ.copy()
+        env["CLICOLOR_FORCE"] = "1"
+        if self.compiler_cache is not None:
+            env.update(self.compiler_cache.env())
+        return env
+
+    def _run(self, name: str, cmake_args, title: str):
+        if self.verbose:
+            cprint(f"running: {' '.join(cmake_args)}", "green")
+        log = BuildLog(f"cmake-{name}", self.root) if self.logs else None
+        code = run_with_progress(cmake_args, title, self.verbose, self._env(), log, cwd=self.root)
+        if log is not None:
+            self.last_log = log.path
+        if code != 0 and log is not None:
+            cprint(f"cmake {name} failed, full log: {log.path}", "red")
+        return code
+
+    def configure(self, fwd_args=[], force: bool = False):
+        configure, _ = self.presets()
+        generator = self._generator(configure)
+        binary_dir = _expand(configure["binaryDir"], self.root, self.root)
+        stamp = binary_dir / CONFIGURE_STAMP_FILE
+        fingerprint = self._fingerprint(configure, generator, fwd_args)
+        if not force and (binary_dir / "CMakeCache.txt").exists() and stamp.exists():
+            try:
+                if json.loads(stamp.read_text()) == fingerprint:
+                    # CMakeLists.txt edits are picked up by the build step's own regeneration check
+                    cprint("configure is up to date, skipping", "green")
+                    return 0
+            except ValueError:
+                pass
+
+        cmake_args = ["cmake", "--preset", configure["name"], *fwd_args]
+        if generator is not None and generator != configure.get("generator"):
+            cmake_args += ["-G", generator]
+        if self.compiler_cache is not None:
+            cmake_args += [f"-D{name}={value}" for name, value in self.compiler_cache.launcher_variables().items()]
+        stamp.unlink(missing_ok=True)
+        code = self._run("configure", cmake_args, "Configuring CMake")
+        if code == 0:
+            stamp.write_text(json.dumps(fingerprint, indent=2, sort_keys=True))
+        return code
+
+    def build(self, fwd_args=[], target: str | None = None):
+        _, build = self.presets()
+        cmake_args = ["cmake", "--build", "--preset", build["name"], "--parallel", str(self.jobs)]
+        if target is not None:
+            cmake_args += ["--target", target]
+        cmake_args += fwd_args
+        cache_stats = self.compiler_cache.stats() if self.compiler_cache is not None else None
+        code = self._run("build", cmake_args, "Building")
+        if self.compiler_cache is not None:
+            self.compiler_cache.print_stats(cache_stats)
+        return code
+
+    def run(self, configure_only: bool = False, fwd_args=[]):
+        code = self.configure(fwd_args, force=configure_only)
+        if code != 0 or configure_only:
+            return code
+        return self.build()
+
+
+def cmake_from_args(args, root: Path = Path.cwd()) -> CMake:
+    return CMake(
+        args.build,
+        args.verbose,
+        root,
+        compiler_cache=compiler_cache_from_args(args),
+        jobs=args.jobs,
+    )
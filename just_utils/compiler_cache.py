@@ -0,0 +1,108 @@
+import os
+import json
+import shutil
+import subprocess
+from pathlib import Path
+from termcolor import cprint, colored
+from .cache import parse_size
+
+
+COMPILER_CACHE_TOOLS = ["ccache", "sccache"]
+CCACHE_HIT_KEYS = ["direct_cache_hit", "preprocessed_cache_hit"]
+CCACHE_MISS_KEYS = ["cache_miss"]
+
+
+def find_compiler_cache(tool: str | None = None) -> str | None:
+    for name in [tool] if tool is not None else COMPILER_CACHE_TOOLS:
+        path = shutil.which(name)
+        if path is not None:
+            return path
+    return None
+
+
+class CompilerCache:
+    def __init__(self, directory: Path, max_size="10G", tool: str | None = None):
+        self.executable = find_compiler_cache(tool)
+        if self.executable is None:
+            raise ValueError(f"No compiler cache found (tried {tool or ', '.join(COMPILER_CACHE_TOOLS)})")
+        self.name = Path(self.executable).stem
+        self.directory = Path(directory).absolute()
+        self.max_size = parse_size(max_size)
+
+    def env(self):
+        size_kib = self.max_size // 1024
+        if self.name == "sccache":
+            return {"SCCACHE_DIR": str(self.directory), "SCCACHE_CACHE_SIZE": f"{size_kib}K"}
+        return {"CCACHE_DIR": str(self.directory), "CCACHE_MAXSIZE": f"{size_kib}Ki"}
+
+    def launcher_variables(self):
+        launcher = Path(self.executable).as_posix()
+        return {
+            "CMAKE_C_COMPILER_LAUNCHER": launcher,
+            "CMAKE_CXX_COMPILER_LAUNCHER": launcher,
+        }
+
+    def toolchain_file(self) -> Path:
+        path = self.directory / f"{self.name}-launcher.cmake"
+        content = "".join(f'set({name} "{value}")\n' for name, value in self.launcher_variables().items())
+        if not path.exists() or path.read_text() != content:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        return path
+
+    def conan_args(self):
+        # applies to every package conan builds, so --build=missing dependencies hit the cache too;
+        # user_toolchain (unlike extra_variables) exists in every conan 2 release, and += keeps
+        # any user_toolchain already set by the profile
+        return ["-c", f"tools.cmake.cmaketoolchain:user_toolchain+={self.toolchain_file().as_posix()}"]
+
+    def _output(self, *args):
+        env = {**os.environ, **self.env()}
+        try:
+            return subprocess.check_output([self.executable, *args], text=True, encoding="utf-8", env=env)
+        except (OSError, subprocess.CalledProcessError) as e:
+            cprint(f"Failed to read {self.name} statistics: {e}", "red")
+            return None
+
+    def stats(self) -> tuple[int, int] | None:
+        if self.name == "sccache":
+            output = self._output("--show-stats", "--stats-format=json")
+            if output is None:
+                return None
+            stats = json.loads(output)["stats"]
+            return (
+                sum(stats["cache_hits"]["counts"].values()),
+                sum(stats["cache_misses"]["counts"].values()),
+            )
+        output = self._output("--print-stats")
+        if output is None:
+            return None
+        counters = {}
+        for line in output.splitlines():
+            key, _, value = line.partition("\t")
+            if value.strip().isdigit():
+                counters[key] = int(value)
+        return (
+            sum(counters.get(key, 0) for key in CCACHE_HIT_KEYS),
+            sum(counters.get(key, 0) for key in CCACHE_MISS_KEYS),
+        )
+
+    def print_stats(self, before: tuple[int, int] | None):
+        after = self.stats()
+        if before is None or after is None:
+            return
+        hits = after[0] - before[0]
+        misses = after[1] - before[1]
+        total = hits + misses
+        rate = 100 * hits / total if total else 0
+        print(
+            f"{self.name}: {colored(hits, 'green', attrs=['bold'])} hits, "
+            f"{colored(misses, 'yellow', attrs=['bold'])} misses "
+            f"({colored(f'{rate:.1f}%', 'green' if rate >= 50 else 'yellow', attrs=['bold'])})"
+        )
+
+
+def compiler_cache_from_args(args) -> CompilerCache | None:
+    if not getattr(args, "compiler_cache", False):
+        return None
+    return CompilerCache(args.compiler_cache_dir, args.compiler_cache_size)
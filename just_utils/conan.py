@@ -1,18 +1,46 @@
 import os
+import json
 import subprocess
 import shutil
 from itertools import chain
 from pathlib import Path
 from termcolor import cprint, colored
-from alive_progress import alive_bar
 from .clean import clean_build_directory
+from .logs import BuildLog
+from .process import run_with_progress
+from .cache import ConanCache, lockfile_refs, graph_refs
+from .compiler_cache import CompilerCache
+
+def cmake_build_type(build_type: str) -> str:
+    match build_type:
+        case "debug":
+            return "Debug"
+        case "release":
+            return "Release"
+        case "minsizerel":
+            return "MinSizeRel"
+        case "relwithdebinfo":
+            return "RelWithDebInfo"
+        case _:
+            raise ValueError(f"Unknown build type: {build_type}")
 
 class Conan:
-    def __init__(self, package_name: str, build_type: str, verbose: bool, root: Path = Path.cwd()):
+    def __init__(
+        self,
+        package_name: str,
+        build_type: str,
+        verbose: bool,
+        root: Path = Path.cwd(),
+        logs: bool = True,
+        compiler_cache: CompilerCache | None = None,
+    ):
         self.root = root
         self.package_name = package_name
         self.build_type = build_type
         self.verbose = verbose
+        self.logs = logs
+        self.last_log = None
+        self.compiler_cache = compiler_cache
 
     def _arg(self, name, value):
         if value is None:
@@ -20,18 +48,16 @@ class Conan:
         return ["-o", f"{self.package_name}/*:{name}={value}"]
 
     def _build_type_arg(self):
-        match self.build_type:
-            case "debug":
-                return "Debug"
-            case "release":
-                return "Release"
-            case "minsizerel":
-                return "MinSizeRel"
-            case "relwithdebinfo":
-                return "RelWithDebInfo"
-            case _:
-                raise ValueError(f"Unknown build type: {self.build_type}")
+        return cmake_build_type(self.build_type)
     
+    @staticmethod
+    def _flatten(conan_args):
+        return list(chain.from_iterable(
+            arg if isinstance(arg, list) else [arg]
+            for arg in conan_args
+            if arg is not None
+        ))
+
     def run(self, command: str, args, fwd_args):
         conan_args = [
             "conan",
@@ -44,12 +70,10 @@ class Conan:
                 self._arg(name, value)
                 for name, value in args.items()
             ),
-            *fwd_args
+            *fwd_args,
+            self.compiler_cache.conan_args() if self.compiler_cache is not None else None,
         ]     
-        flat_args = list(chain.from_iterable(
-            arg if isinstance(arg, list) else [arg]
-            for arg in conan_args
-        ))
+        flat_args = self._flatten(conan_args)
         if not self.verbose:
             flat_args.append("-vwarning")
         if self.verbose:
@@ -57,19 +81,49 @@ class Conan:
         
         env = os.environ.copy()
         env["CLICOLOR_FORCE"] = "1"
-        process = subprocess.Popen(
-            flat_args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env
-        )
-        with alive_bar(0, title='Running Conan') as bar:
-            while True:
-                line = process.stdout.readline()
-                if not line:
-                    break
-                if self.verbose:
-                    print(line, end='')
-                bar()
-        return process.wait()
+        cache_stats = None
+        if self.compiler_cache is not None:
+            env.update(self.compiler_cache.env())
+            cache_stats = self.compiler_cache.stats()
+        log = BuildLog(f"conan-{command}", self.root) if self.logs else None
+        code = run_with_progress(flat_args, 'Running Conan', self.verbose, env, log)
+        if log is not None:
+            self.last_log = log.path
+        if self.compiler_cache is not None:
+            self.compiler_cache.print_stats(cache_stats)
+        if code != 0 and log is not None:
+            cprint(f"conan {command} failed, full log: {log.path}", "red")
+        return code
     
+    def graph_info(self, args={}, fwd_args=[]):
+        graph_args = self._flatten([
+            "conan",
+            "graph",
+            "info",
+            ".",
+            f"--settings=build_type={self._build_type_arg()}",
+            *(
+                self._arg(name, value)
+                for name, value in args.items()
+            ),
+            *fwd_args,
+            "--format=json",
+            "-vquiet",
+        ])
+        return json.loads(subprocess.check_output(graph_args, text=True, encoding="utf-8", cwd=self.root))
+
+    def protected_refs(self, args={}, fwd_args=[]):
+        lockfile = self.root / "conan.lock"
+        if lockfile.exists():
+            return lockfile_refs(lockfile)
+        return graph_refs(self.graph_info(args, fwd_args))
+
+    def collect_garbage(self, budget, args={}, fwd_args=[], dry_run: bool = False, storage: Path | None = None):
+        protected = self.protected_refs(args, fwd_args)
+        if self.verbose:
+            cprint(f"protecting {len(protected)} references used by {self.package_name}", "green")
+        return ConanCache(storage).collect_garbage(budget, protected, dry_run=dry_run, verbose=self.verbose)
+
     def clean(self):
         clean_build_directory(self.root)
 
@@ -0,0 +1,115 @@
+import io
+import re
+import gzip
+from datetime import datetime
+from pathlib import Path
+from termcolor import cprint
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+LOG_BUFFER_SIZE = 1024 * 1024
+LOG_MAX_COUNT = 20
+LOG_MAX_BYTES = 256 * 1024 * 1024
+ANSI_ESCAPE_REGEX = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+
+def log_directory(root: Path = Path.cwd()) -> Path:
+    return root / "build" / "logs"
+
+
+def _log_files(directory: Path):
+    if not directory.is_dir():
+        return []
+    files = [p for p in directory.iterdir() if p.is_file() and p.suffix in (".gz", ".zst")]
+    return sorted(files, key=lambda p: p.stat().st_mtime_ns)
+
+
+def rotate_logs(directory: Path, max_count: int = LOG_MAX_COUNT, max_bytes: int = LOG_MAX_BYTES):
+    files = _log_files(directory)
+    sizes = {p: p.stat().st_size for p in files}
+    total = sum(sizes.values())
+    while files and (len(files) > max_count or total > max_bytes):
+        oldest = files.pop(0)
+        total -= sizes[oldest]
+        oldest.unlink(missing_ok=True)
+
+
+def _open_compressed(path: Path, mode: str):
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise ValueError(f"Cannot open {path}: zstandard is not installed")
+        raw = open(path, mode + "b")
+        if mode == "w":
+            # io.BufferedWriter needs write() to report the uncompressed bytes consumed
+            return zstandard.ZstdCompressor().stream_writer(raw, closefd=True, write_return_read=True)
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return gzip.open(path, mode + "b", compresslevel=6)
+
+
+class BuildLog:
+    def __init__(self, name: str, root: Path = Path.cwd(), max_count: int = LOG_MAX_COUNT, max_bytes: int = LOG_MAX_BYTES):
+        self.directory = log_directory(root)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # make room for the new log before it starts growing
+        rotate_logs(self.directory, max(max_count - 1, 0), max_bytes)
+        suffix = ".log.zst" if zstandard is not None else ".log.gz"
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self.path = self.directory / f"{name}-{stamp}{suffix}"
+        # large buffered writes keep the compressor out of the per-line hot path
+        self._file = io.TextIOWrapper(
+            io.BufferedWriter(_open_compressed(self.path, "w"), buffer_size=LOG_BUFFER_SIZE),
+            encoding="utf-8",
+            errors="replace",
+            newline="",
+        )
+
+    def write(self, line: str):
+        self._file.write(line)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self):
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def last_log(root: Path = Path.cwd()) -> Path | None:
+    files = _log_files(log_directory(root))
+    return files[-1] if files else None
+
+
+def search_log(pattern: str, path: Path | None = None, root: Path = Path.cwd(), ignore_case: bool = False):
+    if path is None:
+        path = last_log(root)
+        if path is None:
+            raise ValueError(f"No logs found in {log_directory(root)}")
+    regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    res = []
+    with io.TextIOWrapper(
+        io.BufferedReader(_open_compressed(path, "r"), buffer_size=LOG_BUFFER_SIZE),
+        encoding="utf-8",
+        errors="replace",
+    ) as f:
+        for number, line in enumerate(f, start=1):
+            line = ANSI_ESCAPE_REGEX.sub("", line.rstrip("\n"))
+            if regex.search(line):
+                res.append((number, line))
+    return res
+
+
+def print_search_log(pattern: str, path: Path | None = None, root: Path = Path.cwd(), ignore_case: bool = False):
+    for number, line in search_log(pattern, path, root, ignore_case):
+        cprint(f"{number:>6}: ", "yellow", end="")
+        print(line)
@@ -0,0 +1,31 @@
+import subprocess
+from pathlib import Path
+from alive_progress import alive_bar
+from .logs import BuildLog
+
+
+def run_with_progress(args, title: str, verbose: bool, env=None, log: BuildLog | None = None, cwd: Path | None = None):
+    try:
+        process = subprocess.Popen(
+            args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env, cwd=cwd
+        )
+    except BaseException:
+        # a run that never started must not become the last run's log
+        if log is not None:
+            log.discard()
+        raise
+    try:
+        with alive_bar(0, title=title) as bar:
+            while True:
+                line = process.stdout.readline()
+                if not line:
+                    break
+                if log is not None:
+                    log.write(line)
+                if verbose:
+                    print(line, end='')
+                bar()
+    finally:
+        if log is not None:
+            log.close()
+    return process.wait()
@@ -0,0 +1,192 @@
+import os
+import json
+import hashlib
+import time
+import subprocess
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from termcolor import cprint, colored
+from .conan import cmake_build_type
+from .process import run_with_progress
+
+
+def _properties(test: dict):
+    return {prop["name"]: prop["value"] for prop in test.get("properties", [])}
+
+
+class CTestCase:
+    def __init__(self, name: str, index: int):
+        self.name = name
+        # ctest's own 1-based test number, used to select tests with -I
+        self.index = index
+        self.status = None
+        self.duration = 0.0
+        self.output = ""
+
+
+class CTestRunner:
+    def __init__(
+        self,
+        build_dir: Path,
+        build_type: str | None = None,
+        jobs: int | None = None,
+        verbose: bool = False,
+        state_path: Path | None = None,
+    ):
+        self.build_dir = build_dir
+        self.config = cmake_build_type(build_type) if build_type is not None else None
+        self.jobs = jobs or os.cpu_count() or 1
+        self.verbose = verbose
+        self.state_path = state_path or ctest_state_path(build_dir)
+        self.state = self._load_state()
+
+    def _load_state(self):
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return {"durations": {}, "failed": []}
+        state.setdefault("durations", {})
+        state.setdefault("failed", [])
+        return state
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps(self.state, indent=2, sort_keys=True))
+
+    def discover(self):
+        ctest_args = ["ctest", "--show-only=json-v1"]
+        if self.config is not None:
+            ctest_args += ["-C", self.config]
+        data = json.loads(subprocess.check_output(ctest_args, cwd=self.build_dir, text=True, encoding="utf-8"))
+        res = []
+        for index, test in enumerate(data.get("tests", []), start=1):
+            if "command" not in test:
+                # e.g. tests not available in this configuration
+                continue
+            if _properties(test).get("DISABLED"):
+                continue
+            res.append(CTestCase(test["name"], index))
+        return res
+
+    def _write_cost_data(self):
+        # ctest starts the most expensive tests first, so feed it our recorded durations;
+        # entries we have no duration for (or can't write) keep ctest's own averages
+        path = self.build_dir / "Testing" / "Temporary" / "CTestCostData.txt"
+        entries = {}
+        failed = set(self.state["failed"])
+        if path.exists():
+            lines = path.read_text().splitlines()
+            separator = lines.index("---") if "---" in lines else len(lines)
+            for line in lines[:separator]:
+                name, _, runs = line.rpartition(" ")[0].rpartition(" ")
+                entries[name] = (line, int(runs) if runs.isdigit() else 1)
+            failed.update(line for line in lines[separator + 1:] if line)
+        for name, duration in self.state["durations"].items():
+            if " " in name:
+                continue
+            runs = entries[name][1] if name in entries else 1
+            entries[name] = (f"{name} {runs} {duration}", runs)
+        lines = [line for _, (line, _) in sorted(entries.items())]
+        lines += ["---", *sorted(failed)]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(lines) + "\n")
+
+    def schedule(self, tests, shard_index: int = 0, shard_count: int = 1, failed_only: bool = False):
+        # selection and sharding only: execution order comes from ctest's cost data
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"Invalid shard {shard_index} of {shard_count}")
+        if failed_only:
+            failed = set(self.state["failed"])
+            tests = [t for t in tests if t.name in failed]
+        # shard by name so every machine agrees on the split regardless of local timings
+        return sorted(tests, key=lambda t: t.name)[shard_index::shard_count]
+
+    def run(self, shard_index: int = 0, shard_count: int = 1, failed_only: bool = False, junit: Path | None = None):
+        tests = self.schedule(self.discover(), shard_index, shard_count, failed_only)
+        if not tests:
+            cprint("no tests to run", "yellow")
+            return 0
+        self._write_cost_data()
+        report = (junit or self.build_dir / "Testing" / "just-utils-junit.xml").absolute()
+        report.parent.mkdir(parents=True, exist_ok=True)
+        report.unlink(missing_ok=True)
+        ctest_args = [
+            "ctest",
+            "-I", "0,0,0," + ",".join(str(t.index) for t in tests),
+            "-j", str(self.jobs),
+            "--output-on-failure",
+            "--output-junit", str(report),
+        ]
+        if self.config is not None:
+            ctest_args += ["-C", self.config]
+        # ctest decides pass/fail and honours RUN_SERIAL, RESOURCE_LOCK, fixtures, DEPENDS etc.
+        start = time.perf_counter()
+        run_with_progress(ctest_args, 'Running tests', self.verbose, cwd=self.build_dir)
+        elapsed = time.perf_counter() - start
+        _read_junit(tests, report)
+
+        for test in tests:
+            if test.status == "failed":
+                cprint(f"FAILED {test.name} ({test.duration:.2f}s)", "red", attrs=["bold"])
+                if not self.verbose and test.output:
+                    print(test.output, end="" if test.output.endswith("\n") else "\n")
+            if test.status != "skipped":
+                self.state["durations"][test.name] = round(test.duration, 3)
+        failed = sorted(t.name for t in tests if t.status == "failed")
+        skipped = [t for t in tests if t.status == "skipped"]
+        ran = {t.name for t in tests}
+        self.state["failed"] = sorted((set(self.state["failed"]) - ran) | set(failed))
+        self._save_state()
+
+        passed = len(tests) - len(failed) - len(skipped)
+        color = "green" if not failed else "red"
+        print(
+            f"{colored(passed, color, attrs=['bold'])}/{len(tests)} tests passed"
+            f"{f', {len(skipped)} skipped' if skipped else ''} in {elapsed:.2f}s"
+        )
+        return 0 if not failed else 1
+
+
+def _read_junit(tests, path: Path):
+    cases = {}
+    if path.exists():
+        for case in ET.parse(path).getroot().iter("testcase"):
+            cases[case.get("name")] = case
+    for test in tests:
+        case = cases.get(test.name)
+        if case is None:
+            test.status = "failed"
+            test.output = "test was not run by ctest"
+            continue
+        test.duration = float(case.get("time") or 0.0)
+        status = case.get("status")
+        if status == "run":
+            test.status = "passed"
+        elif status in ("notrun", "disabled"):
+            test.status = "skipped"
+        else:
+            test.status = "failed"
+        output = case.findtext("system-out") or ""
+        failure = case.find("failure")
+        if failure is not None and failure.get("message"):
+            output += failure.get("message") + "\n"
+        test.output = output
+
+
+def ctest_state_path(build_dir: Path) -> Path:
+    # kept outside build/ so durations and failures survive clean builds
+    key = hashlib.sha1(str(build_dir.absolute()).encode()).hexdigest()[:16]
+    return Path.home() / ".cache" / "just-utils" / "tests" / f"{key}.json"
+
+
+def ctest_build_dir(build_type: str, root: Path = Path.cwd()) -> Path:
+    # cmake_layout puts single-config builds under build/<BuildType>
+    build_dir = root / "build" / cmake_build_type(build_type)
+    if (build_dir / "CTestTestfile.cmake").exists():
+        return build_dir
+    return root / "build"
+
+
+def run_tests(args, root: Path = Path.cwd()):
+    runner = CTestRunner(ctest_build_dir(args.build, root), args.build, args.jobs, args.verbose)
+    return runner.run(args.shard_index, args.shard_count, args.rerun_failed, args.junit)
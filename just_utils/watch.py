@@ -0,0 +1,240 @@
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+from termcolor import cprint, colored
+from .manifest import Manifest
+from .version import show_version, versions
+
+
+STEP_VERSION = "version"
+STEP_INSTALL = "install"
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def _existing_ancestor(directory: Path) -> Path:
+    while not directory.is_dir() and directory != directory.parent:
+        directory = directory.parent
+    return directory
+
+
+def _signature(path: Path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class _PollBackend:
+    name = "polling"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+    def watch(self, paths):
+        pass
+
+    def wait(self, timeout: float | None):
+        # the watched set is a handful of files, so stat()-ing them is cheaper than
+        # walking directories; the watcher compares signatures itself
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        return None
+
+    def close(self):
+        pass
+
+
+class _InotifyBackend:
+    name = "inotify"
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}
+        self._paths = set()
+
+    def watch(self, paths):
+        self._paths = set(paths)
+        # directories that don't exist yet are covered by their nearest existing ancestor
+        for directory in {_existing_ancestor(p.parent) for p in self._paths}:
+            if directory in self._dirs.values():
+                continue
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), INOTIFY_MASK)
+            if wd < 0:
+                cprint(f"Failed to watch {directory}: {os.strerror(ctypes.get_errno())}", "red")
+                continue
+            self._dirs[wd] = directory
+
+    def wait(self, timeout: float | None):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    rescan = True
+                elif mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                elif mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    rescan = True
+                elif wd in self._dirs and name:
+                    changed.add(self._dirs[wd] / os.fsdecode(name))
+        if rescan:
+            # events were lost or a watched directory appeared: pick up new
+            # directories and let the watcher compare every signature
+            self.watch(self._paths)
+            return None
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _backend(interval: float, polling: bool):
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return _InotifyBackend()
+        except (OSError, AttributeError) as e:
+            cprint(f"inotify unavailable ({e}), falling back to polling", "yellow")
+    return _PollBackend(interval)
+
+
+class Watcher:
+    def __init__(
+        self,
+        conan=None,
+        args={},
+        fwd_args=[],
+        root: Path = Path.cwd(),
+        debounce: float = 0.3,
+        interval: float = 0.5,
+        polling: bool = False,
+    ):
+        self.conan = conan
+        self.args = args
+        self.fwd_args = fwd_args
+        self.root = root
+        self.debounce = debounce
+        self.manifest = Manifest(root / ".manifest.yml")
+        self.backend = _backend(interval, polling)
+        self.steps = {}
+        self._signatures = {}
+        self._reload()
+
+    def _version_sources(self):
+        res = [self.root / "CMakeLists.txt"]
+        if 'version' not in self.manifest:
+            return res
+        version = self.manifest['version']
+        if 'header' in version and 'path' in version['header']:
+            res.append(self.root / version['header']['path'])
+        if 'plugin_meta' in version and 'path' in version['plugin_meta']:
+            res.append(self.root / version['plugin_meta']['path'])
+        return res
+
+    def _reload(self):
+        self.steps = {path: {STEP_VERSION} for path in self._version_sources()}
+        # conanfile.py carries the version as well as the recipe
+        self.steps[self.root / "conanfile.py"] = {STEP_VERSION, STEP_INSTALL}
+        self.steps[self.manifest.path] = {STEP_VERSION, STEP_INSTALL}
+        if self.conan is None:
+            for affected in self.steps.values():
+                affected.discard(STEP_INSTALL)
+        self.backend.watch(self.steps.keys())
+        self._snapshot()
+
+    def _snapshot(self):
+        self._signatures = {path: _signature(path) for path in self.steps}
+
+    def _changed(self, candidates=None):
+        paths = self.steps.keys() if candidates is None else [p for p in candidates if p in self.steps]
+        return {p for p in paths if _signature(p) != self._signatures.get(p)}
+
+    def poll(self, timeout: float | None = None):
+        candidates = self.backend.wait(timeout)
+        changed = self._changed(candidates)
+        if not changed:
+            return changed
+        # debounce: keep collecting until the burst settles
+        while True:
+            for p in changed:
+                self._signatures[p] = _signature(p)
+            more = self._changed(self.backend.wait(self.debounce))
+            if not more:
+                return changed
+            changed |= more
+
+    def run_steps(self, changed):
+        steps = set().union(*(self.steps[p] for p in changed))
+        for p in sorted(changed):
+            cprint(f"changed: {colored(p.relative_to(self.root), 'yellow', attrs=['bold'])}", "green")
+        if self.manifest.path in changed:
+            self.manifest = Manifest(self.manifest.path)
+            self._reload()
+        if STEP_VERSION in steps:
+            # a half-saved source reads as None; patching from it would clobber the others
+            if None in versions(self.root):
+                cprint("Failed to read version from every source, skipping version sync", "red")
+            else:
+                versions(self.root, patch=True)
+            show_version(self.root)
+        if STEP_INSTALL in steps:
+            code = self.conan.run("install", self.args, self.fwd_args)
+            if code != 0:
+                cprint(f"conan install failed with code {code}", "red")
+        # our own writes (version patching, conan install) must not retrigger
+        self._snapshot()
+        return steps
+
+    def watch(self):
+        cprint(f"watching {len(self.steps)} files ({self.backend.name}), press Ctrl+C to stop", "green")
+        try:
+            while True:
+                changed = self.poll()
+                if not changed:
+                    continue
+                try:
+                    self.run_steps(changed)
+                except Exception as e:
+                    cprint(f"Failed to process changes: {e}", "red")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.backend.close()
+
+
+def watch_project(conan=None, args={}, fwd_args=[], root: Path = Path.cwd(), polling: bool = False):
+    Watcher(conan, args, fwd_args, root, polling=polling).watch()
@@ -0,0 +1,108 @@
+import json
+import sqlite3
+import just_utils as ju
+
+
+def _make_storage(storage):
+    storage.mkdir()
+    with sqlite3.connect(storage / "cache.sqlite3") as db:
+        db.execute(
+            "CREATE TABLE packages (reference text, rrev text, pkgid text, prev text, "
+            "path text, timestamp real, build_id text, lru integer)"
+        )
+        for i, (ref, lru) in enumerate([("fmt/10.2.1", 100), ("zlib/1.3.1", 200), ("asio/1.32.0", 300)]):
+            (storage / f"p{i}").mkdir()
+            (storage / f"p{i}" / "lib.a").write_bytes(b"\0" * 1024 * (i + 1))
+            db.execute(
+                "INSERT INTO packages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (ref, f"rrev{i}", f"pkgid{i}", f"prev{i}", f"p{i}", 0.0, None, lru),
+            )
+
+
+def test_cache(tmp_path):
+    assert ju.parse_size("100G") == 100 * 1024 ** 3
+    assert ju.parse_size("1.5 MiB") == 1536 * 1024
+
+    storage = tmp_path / "p"
+    _make_storage(storage)
+    cache = ju.ConanCache(storage)
+    assert [p.reference for p in cache.packages()] == ["fmt/10.2.1", "zlib/1.3.1", "asio/1.32.0"]
+    assert [p.size for p in cache.packages()] == [1024, 2048, 3072]
+
+    lockfile = tmp_path / "conan.lock"
+    lockfile.write_text(json.dumps({"version": "0.5", "requires": ["fmt/10.2.1#rrev0%1700000000.0"]}))
+    protected = ju.lockfile_refs(lockfile)
+    assert protected == {"fmt/10.2.1#rrev0"}
+    assert cache.collect_garbage("4K", protected, dry_run=True) == 2048
+    assert cache.collect_garbage(0, protected, dry_run=True) == 5120
+
+
+GRAPH_INFO = {
+    "graph": {
+        "nodes": {
+            "0": {"ref": "conanfile", "id": "0", "recipe": "Consumer", "package_id": None, "prev": None, "context": "host"},
+            "1": {
+                "ref": "fmt/10.2.1#rrev0",
+                "id": "1",
+                "recipe": "Cache",
+                "package_id": "pkgid0",
+                "prev": "prev0",
+                "context": "host",
+                "binary": "Cache",
+            },
+            "2": {
+                "ref": "cmake_helpers/0.1.7@radar/dev#abc",
+                "id": "2",
+                "recipe": "Cache",
+                "package_id": "da39a3ee5e6b4b0d3255bfef95601890afd80709",
+                "prev": "def",
+                "context": "build",
+                "binary": "Skip",
+            },
+        },
+        "root": {"0": "None"},
+        "overrides": {},
+        "resolved_ranges": {"cmake_helpers/[>=0.1.7]@radar/dev": "cmake_helpers/0.1.7@radar/dev"},
+        "replaced_requires": {},
+        "error": None,
+    }
+}
+
+
+def test_cache_eviction(tmp_path, monkeypatch):
+    storage = tmp_path / "p"
+    _make_storage(storage)
+    cache = ju.ConanCache(storage)
+    protected = ju.graph_refs(GRAPH_INFO)
+    assert protected == {"fmt/10.2.1#rrev0", "cmake_helpers/0.1.7@radar/dev#abc"}
+
+    removed = []
+
+    def remove(package):
+        removed.append(package.reference)
+        return 1 if package.reference == "zlib/1.3.1" else 0
+
+    monkeypatch.setattr(cache, "remove", remove)
+    # fmt is protected, zlib fails to remove, so only asio's bytes are freed
+    assert cache.collect_garbage(0, protected) == 3072
+    assert removed == ["zlib/1.3.1", "asio/1.32.0"]
+
+
+def test_protected_refs(tmp_path, monkeypatch):
+    conan = ju.Conan("corona", "debug", False, root=tmp_path)
+    monkeypatch.setattr(conan, "graph_info", lambda args={}, fwd_args=[]: GRAPH_INFO)
+    assert conan.protected_refs() == {"fmt/10.2.1#rrev0", "cmake_helpers/0.1.7@radar/dev#abc"}
+
+    (tmp_path / "conan.lock").write_text(json.dumps({
+        "version": "0.5",
+        "requires": ["zlib/1.3.1#rrev1%1700000000.0"],
+        "build_requires": ["cmake_helpers/0.1.7@radar/dev#abc%1700000000.0"],
+        "python_requires": [],
+        "config_requires": [],
+    }))
+
+    def graph_info(args={}, fwd_args=[]):
+        raise AssertionError("lockfile must be preferred over the graph")
+
+    monkeypatch.setattr(conan, "graph_info", graph_info)
+    assert conan.protected_refs() == {"zlib/1.3.1#rrev1", "cmake_helpers/0.1.7@radar/dev#abc"}
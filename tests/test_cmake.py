@@ -0,0 +1,67 @@
+import json
+import shutil
+import pytest
+import just_utils as ju
+
+
+def _write_presets(root):
+    generators = root / "build" / "Debug" / "generators"
+    generators.mkdir(parents=True)
+    (generators / "conan_toolchain.cmake").write_text('message(STATUS "toolchain")\n')
+    (generators / "CMakePresets.json").write_text(json.dumps({
+        "version": 4,
+        "configurePresets": [{
+            "name": "conan-debug",
+            "generator": "Unix Makefiles",
+            "binaryDir": str(root / "build" / "Debug"),
+            "toolchainFile": "generators/conan_toolchain.cmake",
+            "cacheVariables": {"CMAKE_BUILD_TYPE": "Debug"},
+        }],
+        "buildPresets": [{"name": "conan-debug", "configurePreset": "conan-debug"}],
+    }))
+    (root / "CMakeUserPresets.json").write_text(json.dumps({
+        "version": 4,
+        "include": [str(generators / "CMakePresets.json")],
+    }))
+    return generators / "conan_toolchain.cmake"
+
+
+@pytest.mark.skipif(shutil.which("cmake") is None, reason="cmake is not installed")
+def test_cmake(tmp_path):
+    (tmp_path / "CMakeLists.txt").write_text("cmake_minimum_required(VERSION 3.15)\nproject(x NONE)\n")
+    toolchain = _write_presets(tmp_path)
+
+    cmake = ju.CMake("debug", False, tmp_path, logs=False, jobs=2)
+    assert cmake.run() == 0
+    assert (tmp_path / "build" / "Debug" / "CMakeCache.txt").exists()
+
+    stamp = tmp_path / "build" / "Debug" / ju.CONFIGURE_STAMP_FILE
+    assert json.loads(stamp.read_text())["toolchain"] is not None
+    configured = stamp.stat().st_mtime_ns
+    assert cmake.configure() == 0
+    assert stamp.stat().st_mtime_ns == configured
+
+    toolchain.write_text('message(STATUS "changed")\n')
+    assert cmake.configure() == 0
+    assert stamp.stat().st_mtime_ns != configured
+    configured = stamp.stat().st_mtime_ns
+    assert cmake.configure(force=True) == 0
+    assert stamp.stat().st_mtime_ns != configured
+
+    assert ju.build_jobs() >= 1
+
+
+def test_cmake_presets(tmp_path):
+    _write_presets(tmp_path)
+    presets = tmp_path / "build" / "Debug" / "generators" / "CMakePresets.json"
+    data = json.loads(presets.read_text())
+    data["buildPresets"][0]["configurePreset"] = "conan-missing"
+    presets.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="Configure preset conan-missing not found"):
+        ju.CMake("debug", False, tmp_path).presets()
+
+    parser = ju.default_cmake_parser()
+    cmake = ju.cmake_from_args(parser.parse_args(["-d", "-j", "3"]), tmp_path)
+    assert cmake.jobs == 3
+    assert cmake.compiler_cache is None
+    assert ju.cmake_from_args(parser.parse_args(["-d"]), tmp_path).jobs == ju.build_jobs()
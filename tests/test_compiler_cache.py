@@ -0,0 +1,34 @@
+import os
+import pytest
+import just_utils as ju
+
+
+@pytest.mark.skipif(os.name == "nt", reason="uses a shell script as the ccache stub")
+def test_compiler_cache(tmp_path, monkeypatch, capsys):
+    counter = tmp_path / "hits"
+    counter.write_text("3")
+    ccache = tmp_path / "ccache"
+    ccache.write_text(f'#!/bin/sh\nprintf "direct_cache_hit\\t$(cat {counter})\\ncache_miss\\t1\\nstats_updated_timestamp\\t0\\n"\n')
+    ccache.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    parser = ju.default_cmake_parser(additional_choosers=["compiler_cache"])
+    args = parser.parse_args(["-d", "-k", "--compiler-cache-dir", str(tmp_path / "cache"), "--compiler-cache-size", "1G"])
+    cache = ju.compiler_cache_from_args(args)
+    assert cache.name == "ccache"
+    assert cache.env() == {"CCACHE_DIR": str(tmp_path / "cache"), "CCACHE_MAXSIZE": "1048576Ki"}
+    toolchain = tmp_path / "cache" / "ccache-launcher.cmake"
+    assert cache.conan_args() == ["-c", f"tools.cmake.cmaketoolchain:user_toolchain+={toolchain.as_posix()}"]
+    assert toolchain.read_text() == (
+        f'set(CMAKE_C_COMPILER_LAUNCHER "{ccache.as_posix()}")\n'
+        f'set(CMAKE_CXX_COMPILER_LAUNCHER "{ccache.as_posix()}")\n'
+    )
+
+    before = cache.stats()
+    assert before == (3, 1)
+    counter.write_text("10")
+    cache.print_stats(before)
+    out = ju.ANSI_ESCAPE_REGEX.sub("", capsys.readouterr().out)
+    assert out.strip() == "ccache: 7 hits, 0 misses (100.0%)"
+
+    assert ju.compiler_cache_from_args(parser.parse_args(["-d"])) is None
@@ -0,0 +1,37 @@
+import pytest
+import just_utils as ju
+
+
+def _check_logs(tmp_path, suffix):
+    for i in range(5):
+        with ju.BuildLog("conan-install", tmp_path, max_count=3) as log:
+            for n in range(1000):
+                log.write(f"\x1b[32mline {n} of run {i}\x1b[0m\n")
+    assert log.path.name.endswith(suffix)
+    assert len(list(ju.log_directory(tmp_path).iterdir())) == 3
+    assert ju.last_log(tmp_path) == log.path
+
+    assert ju.search_log(r"line 99\d of run 4", root=tmp_path)[0] == (991, "line 990 of run 4")
+    assert len(ju.search_log(r"of run 4$", root=tmp_path)) == 1000
+    assert ju.search_log(r"of run 3", root=tmp_path) == []
+
+    ju.rotate_logs(ju.log_directory(tmp_path), max_bytes=0)
+    assert ju.last_log(tmp_path) is None
+
+
+def test_logs(tmp_path, monkeypatch):
+    monkeypatch.setattr("just_utils.logs.zstandard", None)
+    _check_logs(tmp_path, ".log.gz")
+
+
+def test_logs_zstd(tmp_path):
+    pytest.importorskip("zstandard")
+    _check_logs(tmp_path, ".log.zst")
+
+
+def test_logs_failed_spawn(tmp_path):
+    log = ju.BuildLog("conan-install", tmp_path)
+    with pytest.raises(OSError):
+        ju.run_with_progress([str(tmp_path / "missing-executable")], "Running", False, log=log)
+    assert log._file.closed
+    assert ju.last_log(tmp_path) is None
@@ -0,0 +1,70 @@
+import shutil
+import subprocess
+import xml.etree.ElementTree as ET
+import pytest
+import just_utils as ju
+
+CMAKE_LISTS = """cmake_minimum_required(VERSION 3.15)
+project(tests NONE)
+enable_testing()
+add_test(NAME ok COMMAND ${CMAKE_COMMAND} -E true)
+add_test(NAME env COMMAND ${CMAKE_COMMAND} -E env sh -c "test $FOO = bar")
+add_test(NAME bad COMMAND ${CMAKE_COMMAND} -E false)
+add_test(NAME expected COMMAND ${CMAKE_COMMAND} -E false)
+add_test(NAME regex COMMAND ${CMAKE_COMMAND} -E echo bar)
+add_test(NAME skip COMMAND ${CMAKE_COMMAND} -E env sh -c "exit 77")
+set_tests_properties(env PROPERTIES ENVIRONMENT "FOO=bar")
+set_tests_properties(expected PROPERTIES WILL_FAIL TRUE)
+set_tests_properties(regex PROPERTIES PASS_REGULAR_EXPRESSION "foo")
+set_tests_properties(skip PROPERTIES SKIP_RETURN_CODE 77)
+"""
+TESTS = {"ok", "env", "bad", "expected", "regex", "skip"}
+
+
+@pytest.mark.skipif(shutil.which("ctest") is None, reason="cmake is not installed")
+def test_testing(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    (tmp_path / "CMakeLists.txt").write_text(CMAKE_LISTS)
+    subprocess.check_call(["cmake", "-S", str(tmp_path), "-B", str(tmp_path / "build")], stdout=subprocess.DEVNULL)
+
+    parser = ju.default_cmake_parser(additional_choosers=["test"])
+    args = parser.parse_args(["-d", "-t", "-j", "2", "--junit", str(tmp_path / "junit.xml")])
+    assert ju.run_tests(args, tmp_path) == 1
+
+    cases = {c.get("name"): c for c in ET.parse(tmp_path / "junit.xml").getroot().iter("testcase")}
+    assert set(cases) == TESTS
+    assert sorted(n for n, c in cases.items() if c.find("failure") is not None) == ["bad", "regex"]
+    assert [n for n, c in cases.items() if c.find("skipped") is not None] == ["skip"]
+
+    runner = ju.CTestRunner(tmp_path / "build")
+    assert runner.state["failed"] == ["bad", "regex"]
+    assert "skip" not in runner.state["durations"]
+    assert {t.name for t in runner.schedule(runner.discover(), failed_only=True)} == {"bad", "regex"}
+    assert runner.run(failed_only=True) == 1
+    shards = [{t.name for t in runner.schedule(runner.discover(), i, 4)} for i in range(4)]
+    assert set().union(*shards) == TESTS
+    assert sum(len(s) for s in shards) == len(TESTS)
+
+    assert runner.state_path.is_relative_to(tmp_path / "home")
+    ju.clean_build_directory(tmp_path)
+    assert ju.CTestRunner(tmp_path / "build").state["failed"] == ["bad", "regex"]
+
+
+def test_cost_data(tmp_path):
+    runner = ju.CTestRunner(tmp_path, state_path=tmp_path / "state.json")
+    cost_data = tmp_path / "Testing" / "Temporary" / "CTestCostData.txt"
+    cost_data.parent.mkdir(parents=True)
+    cost_data.write_text("ok 3 0.2\nother 4 1.5\nwith space 2 0.7\n---\nother\n")
+
+    runner.state["durations"] = {"ok": 5.0, "env": 1.0, "with space": 9.0}
+    runner.state["failed"] = ["bad"]
+    runner._write_cost_data()
+    assert cost_data.read_text() == (
+        "env 1 1.0\n"
+        "ok 3 5.0\n"
+        "other 4 1.5\n"
+        "with space 2 0.7\n"
+        "---\n"
+        "bad\n"
+        "other\n"
+    )
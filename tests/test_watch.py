@@ -0,0 +1,116 @@
+import os
+import sys
+import shutil
+from pathlib import Path
+import pytest
+import semver
+import just_utils as ju
+
+
+class _Conan:
+    def __init__(self):
+        self.calls = []
+
+    def run(self, command, args, fwd_args):
+        self.calls.append(command)
+        return 0
+
+
+def _project(tmp_path):
+    root = tmp_path / "project"
+    shutil.copytree(Path(__file__).parent / "test_data", root)
+    ju.patch_version(semver.Version(2, 8, 12), root)
+    return root
+
+
+def test_watch(tmp_path):
+    root = _project(tmp_path)
+    watcher = ju.Watcher(root=root, debounce=0.05, interval=0.01, polling=True)
+    assert watcher.poll(timeout=0.01) == set()
+
+    header = root / "include" / "version.h"
+    header.write_text(header.read_text().replace("CORONA_VERSION_MINOR 8", "CORONA_VERSION_MINOR 7"))
+    changed = watcher.poll(timeout=0.01)
+    assert changed == {header}
+    assert watcher.run_steps(changed) == {ju.STEP_VERSION}
+    assert set(ju.versions(root)) == {semver.Version(2, 7, 12)}
+    assert watcher.poll(timeout=0.01) == set()
+
+
+def test_watch_broken_sources(tmp_path, capsys):
+    root = _project(tmp_path)
+    watcher = ju.Watcher(root=root, debounce=0.05, interval=0.01, polling=True)
+
+    header = root / "include" / "version.h"
+    header.write_text(header.read_text().replace("#define CORONA_VERSION_MINOR 8\n", ""))
+    watcher.run_steps({header})
+    assert ju.versions(root)[:2] == [semver.Version(2, 8, 12), semver.Version(2, 8, 12)]
+    assert ju.versions(root)[2] is None
+
+    manifest = root / ".manifest.yml"
+    manifest.write_text("version: [unclosed\n")
+    batches = iter([{manifest}, {header}])
+
+    def poll():
+        try:
+            return next(batches)
+        except StopIteration:
+            raise KeyboardInterrupt
+
+    watcher.poll = poll
+    capsys.readouterr()
+    watcher.watch()
+    assert capsys.readouterr().out.count("Failed to process changes") == 2
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is linux only")
+def test_watch_inotify(tmp_path):
+    root = _project(tmp_path)
+    conan = _Conan()
+    watcher = ju.Watcher(conan, root=root, debounce=0.05)
+    assert watcher.backend.name == "inotify"
+    assert watcher.poll(timeout=0.05) == set()
+
+    conanfile = root / "conanfile.py"
+    conanfile.write_text(conanfile.read_text() + "# edited\n")
+    changed = watcher.poll(timeout=1)
+    assert changed == {conanfile}
+    assert watcher.run_steps(changed) == {ju.STEP_VERSION, ju.STEP_INSTALL}
+    assert conan.calls == ["install"]
+
+    header = root / "include" / "version.h"
+    header.write_text(header.read_text().replace("CORONA_VERSION_PATCH 12", "CORONA_VERSION_PATCH 11"))
+    changed = watcher.poll(timeout=1)
+    assert changed == {header}
+    assert watcher.run_steps(changed) == {ju.STEP_VERSION}
+    assert conan.calls == ["install"]
+    assert set(ju.versions(root)) == {semver.Version(2, 8, 11)}
+    # the version sync rewrote conanfile.py, which must not trigger an install
+    assert watcher.poll(timeout=0.2) == set()
+    watcher.backend.close()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is linux only")
+def test_watch_inotify_rescan(tmp_path):
+    root = _project(tmp_path)
+    header_text = (root / "include" / "version.h").read_text()
+    shutil.rmtree(root / "include")
+    watcher = ju.Watcher(root=root, debounce=0.05)
+
+    header = root / "include" / "version.h"
+    header.parent.mkdir()
+    header.write_text(header_text)
+    assert watcher.poll(timeout=1) == {header}
+
+    header.write_text(header_text.replace("CORONA_VERSION_PATCH 12", "CORONA_VERSION_PATCH 11"))
+    assert watcher.poll(timeout=1) == {header}
+
+    # a queue overflow (wd == -1) drops events, so the backend asks for a full scan
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    os.close(watcher.backend.fd)
+    watcher.backend.fd = read_fd
+    os.write(write_fd, ju.INOTIFY_EVENT.pack(-1, ju.IN_Q_OVERFLOW, 0, 0))
+    assert watcher.backend.wait(1) is None
+    os.close(write_fd)
+    watcher.backend.close()